@@ -3,15 +3,19 @@ os.environ["USER_AGENT"] = "LegalQAApp/1.0 (+https://yourdomain.com)"
 
 import streamlit as st
 from langchain_aws import BedrockEmbeddings, ChatBedrock
-from config import AWS_REGION, EMBED_MODEL, LLM_MODEL
+from config import AWS_REGION, EMBED_MODEL, LLM_MODEL, URL_CACHE_TTL
 from loaders.url_loader import load_from_url
 from vectorstore.store import get_vector_store
+from vectorstore.portfolio import get_portfolio_index
+from vectorstore.snapshots import save_snapshot
 
 from modules.summary_module import show_summary
 from modules.qa_module import show_qa
 from modules.violations_module import show_hypothetical_violations
 from modules.risk_module import show_risk_dashboard
 from modules.comparison_module import show_comparison
+from modules.portfolio_module import show_portfolio_search
+from modules.version_module import show_version_changes
 
 # --------------------------
 # Theme Styling (extra polish)
@@ -88,7 +92,7 @@ llm = get_llm()
 # --------------------------
 # Utility functions
 # --------------------------
-@st.cache_data(show_spinner="Loading and chunking document...")
+@st.cache_data(show_spinner="Loading and chunking document...", ttl=URL_CACHE_TTL)
 def load_documents_from_url(url: str):
     docs = load_from_url(url)
     for d in docs:
@@ -111,6 +115,10 @@ def main():
         st.info("👉 Paste a T&C URL above to get started")
         return
 
+    # Re-fetch on demand so a new version can be recorded before the cache expires
+    if st.button("🔄 Re-fetch latest version"):
+        load_documents_from_url.clear(url)
+
     # Load documents from first URL
     all_docs = load_documents_from_url(url)
     st.success(f"✅ Loaded {len(all_docs)} chunks from {url}")
@@ -118,6 +126,13 @@ def main():
     # Create vector store for RAG
     vector_store = get_vector_store(all_docs, embeddings, source=url)
 
+    # Add to the cross-document portfolio index (no-op if unchanged)
+    portfolio = get_portfolio_index(embeddings)
+    portfolio.add_documents(all_docs, source=url, vector_store=vector_store)
+
+    # Store a versioned snapshot (skipped if content is unchanged)
+    save_snapshot(all_docs, source=url)
+
     st.divider()
 
     # --------------------------
@@ -159,16 +174,29 @@ def main():
     url_b = st.text_input("Enter the second T&C URL for comparison (optional)")
 
     if url_b:
-        # First doc (already loaded earlier)
-        doc1_text = "\n".join([d.page_content for d in all_docs])
-
-        # Second doc (newly loaded)
+        # Second doc (newly loaded); the first is already loaded as all_docs
         docs_b = load_documents_from_url(url_b)
         st.success(f"✅ Loaded {len(docs_b)} chunks from {url_b}")
-        doc2_text = "\n".join([d.page_content for d in docs_b])
+        portfolio.add_documents(docs_b, source=url_b)
+
+        # Pass the chunk lists into the comparison module, which packs them per parameter
+        show_comparison(llm, all_docs, docs_b)
+
+    st.divider()
 
-        # Pass plain text into comparison module
-        show_comparison(llm, doc1_text, doc2_text)
+    # --------------------------
+    # 6. Changes Since Earlier Versions
+    # --------------------------
+    st.markdown("## 🕒 What Changed Since Last Version")
+    show_version_changes(llm, embeddings, url)
+
+    st.divider()
+
+    # --------------------------
+    # 7. Portfolio-wide Clause Search
+    # --------------------------
+    st.markdown("## 📚 Search Across All Documents")
+    show_portfolio_search(portfolio)
 
 
 if __name__ == "__main__":
@@ -5,5 +5,18 @@ AWS_REGION = "us-east-1"
 EMBED_MODEL = "amazon.titan-embed-text-v2:0"
 LLM_MODEL = "anthropic.claude-3-5-sonnet-20240620-v1:0"
 
+# How long a fetched URL is cached before it is downloaded again (seconds)
+URL_CACHE_TTL = 6 * 60 * 60
+
 # Ensure AWS region is set
 os.environ["AWS_REGION_NAME"] = AWS_REGION
+
+# Prompt context budgets (estimated tokens) per task
+CONTEXT_BUDGETS = {
+    "default": 8000,
+    "summary_parameters": 6000,
+    "summary": 12000,
+    "violations": 6000,
+    "comparison": 4000,  # per document, per parameter
+    "changes": 8000,
+}
@@ -14,10 +14,34 @@ def load_file(file_path, file_type):
     documents = loader.load()
     return split_documents(documents)
 
-def split_documents(documents, chunk_size=1000, overlap=150):
+CHUNK_OVERLAP = 150
+
+
+def split_documents(documents, chunk_size=1000, overlap=CHUNK_OVERLAP):
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
-        chunk_overlap=overlap
+        chunk_overlap=overlap,
+        add_start_index=True
     )
     return splitter.split_documents(documents)
 
+
+def overlap_length(prev, curr, min_overlap=20, max_overlap=CHUNK_OVERLAP):
+    """Length of the longest suffix of `prev` that is also a prefix of `curr` (splitter overlap)."""
+    for k in range(min(len(prev), len(curr), max_overlap), min_overlap - 1, -1):
+        if prev.endswith(curr[:k]):
+            return k
+    return 0
+
+
+def join_chunks(texts):
+    """Rebuild continuous text from consecutive chunks, removing the overlap between them."""
+    parts, prev = [], None
+    for text in texts:
+        if prev is None:
+            parts.append(text)
+        else:
+            k = overlap_length(prev, text)
+            parts.append(text[k:] if k else "\n\n" + text)
+        prev = text
+    return "".join(parts)
@@ -6,16 +6,19 @@ import json
 
 import json
 from langchain.prompts import PromptTemplate
-from langchain.schema import Document
 from .summary_module import extract_summary_parameters
+from qa.context import pack_context
 import re
 
-def compare_documents(llm, doc1_text, doc2_text, top_k=5):
-    """Compare two T&C documents dynamically, returning structured JSON with plain text Overall."""
+def compare_documents(llm, chunks_doc1, chunks_doc2, top_k=5):
+    """
+    Compare two T&C documents dynamically, returning structured JSON with plain text Overall.
+    Both documents are passed as their loaded chunk lists and packed per parameter.
+    """
 
-    # Step 1: Detect parameters (reuse summary logic) → use Document objects
-    params_doc1 = extract_summary_parameters(llm, [Document(page_content=doc1_text)], max_params=top_k)
-    params_doc2 = extract_summary_parameters(llm, [Document(page_content=doc2_text)], max_params=top_k)
+    # Step 1: Detect parameters (reuse summary logic)
+    params_doc1 = extract_summary_parameters(llm, chunks_doc1, max_params=top_k)
+    params_doc2 = extract_summary_parameters(llm, chunks_doc2, max_params=top_k)
 
     # Step 2: Merge into unique set of parameters
     all_params = sorted(set(params_doc1 + params_doc2))[:top_k]
@@ -45,7 +48,11 @@ Document B:
         )
         
         chain = prompt | llm
-        response = chain.invoke({"doc1": doc1_text, "doc2": doc2_text, "param": param})
+        response = chain.invoke({
+            "doc1": pack_context(chunks_doc1, task="comparison", query=param),
+            "doc2": pack_context(chunks_doc2, task="comparison", query=param),
+            "param": param,
+        })
 
         try:
             # ✅ Extract JSON part even if extra text is returned
@@ -63,12 +70,12 @@ Document B:
 
     return comparisons
 
-def show_comparison(llm, doc1_text, doc2_text, top_k=5):
+def show_comparison(llm, chunks_doc1, chunks_doc2, top_k=5):
     """Streamlit UI for comparing two documents with expandable sections + clean formatting."""
     st.subheader("📊 Terms & Conditions Comparison")
 
     with st.spinner(f"Analyzing top {top_k} parameters..."):
-        results = compare_documents(llm, doc1_text, doc2_text, top_k=top_k)
+        results = compare_documents(llm, chunks_doc1, chunks_doc2, top_k=top_k)
 
     for param, result in results.items():
         with st.expander(f"🔹 {param}", expanded=False):
@@ -0,0 +1,40 @@
+import streamlit as st
+
+
+def show_portfolio_search(portfolio):
+    """Streamlit UI for searching clauses across every ingested T&C document."""
+    indexed = portfolio.sources()
+    if not indexed:
+        st.info("No documents in the portfolio index yet.")
+        return
+
+    st.caption(f"📚 {len(indexed)} documents indexed")
+
+    query = st.text_input(
+        "Search clauses across all documents:",
+        placeholder="e.g., Which vendors allow unilateral termination?"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        domains = st.multiselect(
+            "Filter by domain",
+            sorted({entry["domain"] for entry in indexed})
+        )
+    with col2:
+        since = st.date_input("Ingested since", value=None)
+
+    if query:
+        with st.spinner("Searching portfolio... 🔍"):
+            groups = portfolio.search(query, k=15, domains=domains or None, since=since)
+
+        if not groups:
+            st.warning("No matching clauses found.")
+            return
+
+        for group in groups:
+            with st.expander(f"📄 {group['source']} — {len(group['clauses'])} clause(s)"):
+                st.markdown(f"**Domain:** {group['domain']} · **Ingested:** {group['ingested_at']}")
+                for clause in group["clauses"]:
+                    clause_text = clause["text"].strip().replace("\n", " ")
+                    st.markdown(f"> {clause_text}")
@@ -1,12 +1,14 @@
 # modules/summary_module.py
 import streamlit as st
+from qa.context import pack_context
 
 def extract_summary_parameters(llm, all_docs, max_params=6):
     """
     Ask the LLM to detect the most important sections/parameters of a Terms & Conditions document.
     Returns a list of section names.
     """
-    full_text = "\n".join([doc.page_content for doc in all_docs])
+    # No query yet: sample the whole document evenly so later sections are not cut off
+    full_text = pack_context(all_docs, task="summary_parameters", spread=True)
     prompt = f"""
 You are an expert in analyzing Terms & Conditions documents. 
 Identify the {max_params} most important sections or parameters that are critical for a user to know.
@@ -29,8 +31,8 @@ def summarize_terms(llm, all_docs):
     # Detect main parameters
     main_params = extract_summary_parameters(llm, all_docs)
     
-    # Combine all document chunks
-    full_text = "\n".join([doc.page_content for doc in all_docs])
+    # Pack the most relevant chunks into the summary budget
+    full_text = pack_context(all_docs, task="summary", query=" ".join(map(str, main_params)))
     
     summary_prompt = f"""
 You are an expert in reading legal Terms & Conditions documents. 
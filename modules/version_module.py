@@ -0,0 +1,207 @@
+# modules/version_module.py
+import difflib
+import json
+import re
+
+import numpy as np
+import streamlit as st
+from langchain.prompts import PromptTemplate
+
+from qa.context import batch_by_budget
+from vectorstore.snapshots import chunk_hash, list_snapshots, load_snapshot_chunks
+
+
+def _word_diff(old: str, new: str) -> str:
+    """Compact inline word diff: [-removed-] {+added+}."""
+    old_words, new_words = old.split(), new.split()
+    out = []
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            out.extend(old_words[i1:i2])
+            continue
+        if i2 > i1:
+            out.append("[-" + " ".join(old_words[i1:i2]) + "-]")
+        if j2 > j1:
+            out.append("{+" + " ".join(new_words[j1:j2]) + "+}")
+    return " ".join(out)
+
+
+# Text-diff fallback is only tried for a clause's closest embedding neighbours above this floor.
+TEXT_FALLBACK_MIN_SIMILARITY = 0.5
+TEXT_FALLBACK_NEIGHBOURS = 3
+
+
+def _text_similar(old: str, new: str, min_ratio: float) -> bool:
+    """Word-level difflib ratio check, short-circuited by the cheap upper bounds."""
+    matcher = difflib.SequenceMatcher(None, old.split(), new.split(), autojunk=False)
+    return (
+        matcher.real_quick_ratio() >= min_ratio
+        and matcher.quick_ratio() >= min_ratio
+        and matcher.ratio() >= min_ratio
+    )
+
+
+def diff_versions(embeddings, old_chunks, new_chunks, min_similarity=0.8, min_text_ratio=0.5):
+    """
+    Align two versions of a document clause-by-clause.
+
+    Identical chunks are matched by content hash and never embedded. The remaining
+    chunks are paired greedily by embedding cosine similarity; a pair counts as
+    "modified" if the embeddings are close or, failing that, the word-level diff ratio
+    is high enough. The text fallback is only tried for each old clause's few nearest
+    neighbours above TEXT_FALLBACK_MIN_SIMILARITY, so a rewritten document does not
+    trigger a text diff for every pair. Unpaired chunks are reported as removed/added.
+
+    Returns:
+        {"added": [text], "removed": [text], "modified": [{"old", "new", "diff"}], "unchanged": int}
+    """
+    new_by_hash = {}
+    for i, text in enumerate(new_chunks):
+        new_by_hash.setdefault(chunk_hash(text), []).append(i)
+
+    unchanged = 0
+    old_left = []
+    matched_new = set()
+    for text in old_chunks:
+        candidates = new_by_hash.get(chunk_hash(text))
+        if candidates:
+            matched_new.add(candidates.pop(0))
+            unchanged += 1
+        else:
+            old_left.append(text)
+    new_left = [t for i, t in enumerate(new_chunks) if i not in matched_new]
+
+    changes = {"added": [], "removed": [], "modified": [], "unchanged": unchanged}
+    if not old_left or not new_left:
+        changes["removed"], changes["added"] = old_left, new_left
+        return changes
+
+    vectors = np.array(embeddings.embed_documents(old_left + new_left), dtype="float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    similarity = vectors[:len(old_left)] @ vectors[len(old_left):].T
+
+    # Candidate pairs: close enough on embeddings alone, or a near neighbour worth a text check
+    neighbours = min(TEXT_FALLBACK_NEIGHBOURS, similarity.shape[1])
+    nearest = np.zeros(similarity.shape, dtype=bool)
+    top = np.argpartition(-similarity, neighbours - 1, axis=1)[:, :neighbours]
+    np.put_along_axis(nearest, top, True, axis=1)
+    candidates = (similarity >= min_similarity) | (nearest & (similarity >= TEXT_FALLBACK_MIN_SIMILARITY))
+    flat_candidates = np.flatnonzero(candidates)
+    ordered = flat_candidates[np.argsort(-similarity.flat[flat_candidates], kind="stable")]
+
+    used_old, used_new = set(), set()
+    modified = []
+    for flat in ordered:
+        if len(used_old) == len(old_left) or len(used_new) == len(new_left):
+            break
+        i, j = np.unravel_index(flat, similarity.shape)
+        if i in used_old or j in used_new:
+            continue
+        if similarity[i, j] < min_similarity and not _text_similar(old_left[i], new_left[j], min_text_ratio):
+            continue
+        used_old.add(i)
+        used_new.add(j)
+        modified.append((j, {
+            "old": old_left[i],
+            "new": new_left[j],
+            "diff": _word_diff(old_left[i], new_left[j]),
+        }))
+
+    # Report modified clauses in the order they appear in the new version
+    changes["modified"] = [m for _, m in sorted(modified, key=lambda pair: pair[0])]
+    changes["removed"] = [t for i, t in enumerate(old_left) if i not in used_old]
+    changes["added"] = [t for j, t in enumerate(new_left) if j not in used_new]
+    return changes
+
+
+def explain_changes(llm, changes):
+    """
+    Send only the changed clauses to the LLM for explanation and risk re-scoring.
+    Changes are split into batches that fit the "changes" token budget, one call per batch.
+    """
+    items = (
+        [("Added", t) for t in changes["added"]]
+        + [("Removed", t) for t in changes["removed"]]
+        + [("Modified", m["diff"]) for m in changes["modified"]]
+    )
+    entries = [f"Change {i} ({kind}):\n{text}" for i, (kind, text) in enumerate(items, start=1)]
+
+    explanations = []
+    for batch in batch_by_budget(entries, task="changes"):
+        explanations.extend(_explain_batch(llm, "\n\n".join(batch)))
+    return explanations
+
+
+def _explain_batch(llm, changes_text):
+    prompt = PromptTemplate(
+        input_variables=["changes"],
+        template="""
+You are reviewing what changed between two versions of the same Terms & Conditions document.
+In modified clauses, [-text-] was removed and {{+text+}} was added.
+
+For each change, explain in plain English what it means for the user and rate the user risk
+it introduces as High, Medium, or Low.
+
+Return your answer strictly as a **valid JSON** list with this schema:
+[
+  {{"Change": 1, "Type": "Added/Removed/Modified", "Summary": "short description", "Impact": "what it means for the user", "Risk": "High/Medium/Low"}}
+]
+
+Changes:
+{changes}
+"""
+    )
+    response = (prompt | llm).invoke({"changes": changes_text})
+
+    try:
+        json_match = re.search(r"\[.*\]", response.content, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group(0))
+        raise ValueError("No JSON found in response")
+    except Exception:
+        return [{"Change": "-", "Type": "-", "Summary": "Error parsing response",
+                 "Impact": response.content.strip(), "Risk": "-"}]
+
+
+def show_version_changes(llm, embeddings, source):
+    """Streamlit UI for comparing the current document against an earlier snapshot of the same source."""
+    versions = list_snapshots(source)
+    if len(versions) < 2:
+        st.info("No earlier version of this document stored yet. Changes will appear once it is updated.")
+        return
+
+    current = versions[-1]
+    options = [v["id"] for v in reversed(versions[:-1])]
+    labels = {v["id"]: v["created_at"] for v in versions}
+    baseline_id = st.selectbox(
+        "Compare current version against:",
+        options,
+        format_func=lambda vid: labels[vid],
+    )
+
+    results = st.session_state.setdefault("version_changes", {})
+    key = (source, baseline_id, current["id"])
+
+    if st.button("🕒 Analyze Changes"):
+        old_chunks = load_snapshot_chunks(source, baseline_id)
+        new_chunks = load_snapshot_chunks(source, current["id"])
+        with st.spinner("Diffing clauses..."):
+            changes = diff_versions(embeddings, old_chunks, new_chunks)
+        with st.spinner("Explaining changes..."):
+            explanations = explain_changes(llm, changes)
+        results[key] = (changes, explanations)
+
+    if key in results:
+        changes, explanations = results[key]
+        st.markdown(
+            f"**{len(changes['added'])}** added · **{len(changes['removed'])}** removed · "
+            f"**{len(changes['modified'])}** modified · {changes['unchanged']} unchanged clauses"
+        )
+        if not explanations:
+            st.success("✅ No clause-level changes found.")
+            return
+
+        for item in explanations:
+            with st.expander(f"🔹 {item.get('Type', '')}: {item.get('Summary', '')} — Risk: {item.get('Risk', '?')}"):
+                st.write(item.get("Impact", ""))
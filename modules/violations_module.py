@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from qa.chain import build_qa_chain
+from qa.context import pack_context
 
 def show_hypothetical_violations(llm, vector_store):
     st.subheader("🚨 Hypothetical Policy Violations")
@@ -10,7 +11,7 @@ def show_hypothetical_violations(llm, vector_store):
         retriever = vector_store.as_retriever(search_kwargs={"k": 15})
         docs = retriever.get_relevant_documents("terms")  # just fetch top docs
 
-        chunks_text = "\n".join([doc.page_content for doc in docs])
+        chunks_text = pack_context(docs, task="violations")
         violation_prompt = """Based on the following Terms & Conditions, create 5 realistic hypothetical situations 
         where a user might unintentionally or intentionally break the policy. 
         Present the output in a Markdown table with the following columns:
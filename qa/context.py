@@ -0,0 +1,160 @@
+import math
+import re
+from collections import Counter
+
+from config import CONTEXT_BUDGETS
+from loaders.file_loader import overlap_length
+
+# Rough chars-per-token ratio for English prose with Claude/Titan tokenizers.
+CHARS_PER_TOKEN = 4
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with", "your", "you", "we", "our",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate (no tokenizer round-trip)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _text_of(chunk) -> str:
+    return chunk if isinstance(chunk, str) else chunk.page_content
+
+
+def _document_order(chunks):
+    """
+    Sort key for restoring document order: (source, start_index) when the splitter
+    recorded offsets, otherwise the incoming position.
+    """
+    metadatas = [getattr(c, "metadata", {}) for c in chunks]
+    if all("start_index" in m for m in metadatas):
+        return lambda i: (metadatas[i].get("source", ""), metadatas[i]["start_index"])
+    return lambda i: i
+
+
+def _spread_order(n):
+    """Indices 0..n-1 ordered so that every prefix is spread evenly (van der Corput sequence)."""
+    order, seen, k = [], set(), 0
+    while len(order) < n:
+        x, denominator, bits = 0.0, 1.0, k
+        while bits:
+            denominator *= 2
+            x += (bits & 1) / denominator
+            bits >>= 1
+        i = int(x * n)
+        if i not in seen:
+            seen.add(i)
+            order.append(i)
+        k += 1
+    return order
+
+
+def _terms(text: str):
+    return [t for t in _WORD_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def rank_chunks(chunks, query=None, spread=False):
+    """
+    Return chunk indices ordered by relevance.
+    With a query, chunks are scored by query-term frequency weighted by IDF over
+    the chunk set (stopwords ignored). With `spread`, chunks are ordered so that
+    any prefix samples the whole document evenly (for whole-document tasks with no
+    query). Otherwise the incoming order is kept (e.g. retriever results are
+    already ranked).
+    """
+    order = list(range(len(chunks)))
+    if spread:
+        in_document_order = sorted(order, key=_document_order(chunks))
+        return [in_document_order[i] for i in _spread_order(len(chunks))]
+    query_terms = set(_terms(query or ""))
+    if not query_terms:
+        return order
+
+    chunk_terms = [Counter(_terms(_text_of(c))) for c in chunks]
+    n = len(chunks)
+    idf = {
+        t: math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for t in query_terms
+        for df in [sum(1 for terms in chunk_terms if t in terms)]
+    }
+    scores = [sum(math.log1p(terms[t]) * idf[t] for t in query_terms) for terms in chunk_terms]
+    return sorted(order, key=lambda i: -scores[i])
+
+
+def batch_by_budget(texts, task: str, budget=None):
+    """
+    Split texts into consecutive batches that each fit the task's token budget,
+    so nothing is dropped. A text larger than the budget gets a batch of its own.
+    """
+    budget = budget or CONTEXT_BUDGETS.get(task, CONTEXT_BUDGETS["default"])
+    batches, current, used = [], [], 0
+    for text in texts:
+        cost = estimate_tokens(text)
+        if current and used + cost > budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pack_context(chunks, task: str, query=None, budget=None, separator="\n", spread=False):
+    """
+    Assemble prompt context from chunks within a token budget.
+
+    Chunks (Documents or strings) are ranked by relevance, exact duplicates are
+    dropped, and the highest-ranked chunks are packed until the budget is reached.
+    Selected chunks are put back in document order (via the splitter's start_index
+    metadata when present) and any prefix that repeats the tail of another selected
+    chunk (the splitter overlap) is trimmed. The trimming does not depend on the
+    input order, so retriever results in rank order are handled too.
+
+    Args:
+        chunks: List of Document objects or strings
+        task: Key into CONTEXT_BUDGETS (also used for logging)
+        query: Optional text used to rank chunks
+        budget: Token budget override
+        spread: Without a query, sample chunks evenly across the document instead of
+            keeping the incoming order (see rank_chunks)
+    Returns:
+        The packed context string
+    """
+    budget = budget or CONTEXT_BUDGETS.get(task, CONTEXT_BUDGETS["default"])
+    texts = [_text_of(c).strip() for c in chunks]
+    original_tokens = estimate_tokens(separator.join(texts))
+
+    selected, seen, used = set(), set(), 0
+    for i in rank_chunks(chunks, query, spread=spread):
+        if not texts[i] or texts[i] in seen:
+            continue
+        cost = estimate_tokens(texts[i])
+        if used + cost > budget:
+            continue
+        selected.add(i)
+        seen.add(texts[i])
+        used += cost
+
+    parts = []
+    for i in sorted(selected, key=_document_order(chunks)):
+        trim = max((overlap_length(texts[j], texts[i]) for j in selected if j != i), default=0)
+        text = texts[i][trim:].lstrip()
+        if text:
+            parts.append(text)
+
+    left_out = len({t for t in texts if t}) - len(selected)
+    if left_out:
+        print(f"⚠️ [{task}] context truncated: {left_out} of {len(texts)} chunks did not fit the budget")
+
+    context = separator.join(parts)
+    packed_tokens = estimate_tokens(context)
+    print(
+        f"✂️ [{task}] packed {len(parts)}/{len(texts)} chunks: "
+        f"~{packed_tokens} tokens (budget {budget}, saved ~{original_tokens - packed_tokens} "
+        f"of {original_tokens})"
+    )
+    return context
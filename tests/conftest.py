@@ -0,0 +1,33 @@
+import hashlib
+import re
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+
+class StubEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings: texts sharing words get close vectors."""
+
+    def __init__(self, dimension=64):
+        self.dimension = dimension
+        self.calls = 0
+
+    def _embed(self, text):
+        vector = np.zeros(self.dimension, dtype="float32")
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+@pytest.fixture
+def embeddings():
+    return StubEmbeddings()
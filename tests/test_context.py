@@ -0,0 +1,82 @@
+import random
+
+from langchain.schema import Document
+
+from loaders.file_loader import overlap_length, split_documents
+from qa.context import batch_by_budget, estimate_tokens, pack_context, rank_chunks
+
+
+def _normalize(text):
+    # Packed chunks are joined with newlines, the raw text with spaces
+    return " ".join(text.split())
+
+
+def _document(seed=0, words=1500):
+    rng = random.Random(seed)
+    return " ".join("".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(words))
+
+
+def test_overlap_length():
+    shared = "the user may terminate the account"
+    assert overlap_length("Either party may give notice: " + shared, shared + " at any time.") == len(shared)
+    assert overlap_length("no shared text here", "completely different start") == 0
+
+
+def test_pack_context_removes_overlap_in_document_order():
+    raw = _document()
+    chunks = split_documents([Document(page_content=raw, metadata={"source": "doc"})])
+    assert len(chunks) > 1
+
+    assert _normalize(pack_context(chunks, task="test", budget=100_000)) == raw
+
+
+def test_pack_context_removes_overlap_in_rank_order():
+    raw = _document()
+    chunks = split_documents([Document(page_content=raw, metadata={"source": "doc"})])
+    shuffled = chunks[:]
+    random.Random(1).shuffle(shuffled)
+
+    # With offsets: document order is restored exactly
+    assert _normalize(pack_context(shuffled, task="test", budget=100_000)) == raw
+
+    # Without offsets (plain strings): overlap is still removed
+    packed = pack_context([c.page_content for c in shuffled], task="test", budget=100_000)
+    assert len(_normalize(packed)) == len(raw)
+
+
+def test_pack_context_respects_budget():
+    chunks = split_documents([Document(page_content=_document(words=3000))])
+    budget = 600
+    packed = pack_context(chunks, task="test", budget=budget)
+    assert 0 < estimate_tokens(packed) <= budget
+
+
+def test_pack_context_drops_duplicates():
+    packed = pack_context(["Refunds within 30 days.", "Refunds within 30 days."], task="test", budget=100)
+    assert packed == "Refunds within 30 days."
+
+
+def test_rank_chunks_ignores_stopwords():
+    chunks = [
+        "The use of the service and the rules of the site and the terms of the agreement.",
+        "Liability is limited to the amount you paid.",
+    ]
+    assert rank_chunks(chunks, query="Limitation of Liability")[0] == 1
+
+
+def test_batch_by_budget_keeps_every_text():
+    texts = ["x" * 400] * 5  # 100 tokens each
+    batches = batch_by_budget(texts, task="test", budget=250)
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert sum(batches, []) == texts
+
+
+def test_spread_samples_whole_document():
+    chunks = [f"Section {i}. ".ljust(400, "x") for i in range(100)]  # 100 tokens each
+    packed = pack_context(chunks, task="test", budget=1000, spread=True)
+
+    sections = [int(line.split(".")[0].split()[1]) for line in packed.splitlines()]
+    assert len(sections) == 10
+    assert sections == sorted(sections)
+    # Every quarter of the document is represented, not just the head
+    assert {s // 25 for s in sections} == {0, 1, 2, 3}
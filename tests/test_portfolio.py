@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+from langchain.schema import Document
+
+from vectorstore.portfolio import PortfolioIndex
+
+
+def _docs(prefix, n=10):
+    return [Document(page_content=f"{prefix} clause {i} about refunds and termination") for i in range(n)]
+
+
+def _index(embeddings, tmp_path):
+    return PortfolioIndex(embeddings, base_path=str(tmp_path / "portfolio"))
+
+
+def test_reingesting_unchanged_content_is_a_noop(embeddings, tmp_path):
+    index = _index(embeddings, tmp_path)
+    assert index.add_documents(_docs("alpha"), "https://a.com/tos") == 10
+    calls = embeddings.calls
+
+    assert index.add_documents(_docs("alpha"), "https://a.com/tos") == 0
+    assert index.store.index.ntotal == 10
+    assert embeddings.calls == calls
+
+
+def test_changed_content_hides_old_chunks(embeddings, tmp_path):
+    index = _index(embeddings, tmp_path)
+    index.add_documents(_docs("alpha"), "https://a.com/tos")
+    index.add_documents(_docs("omega"), "https://a.com/tos")
+
+    groups = index.search("alpha clause refunds", k=10, per_document=10)
+    texts = [c["text"] for g in groups for c in g["clauses"]]
+    assert texts
+    assert all(t.startswith("omega") for t in texts)
+
+
+def test_compact_keeps_id_ranges_consistent(embeddings, tmp_path):
+    index = _index(embeddings, tmp_path)
+    index.add_documents(_docs("alpha"), "https://a.com/tos")
+    index.add_documents(_docs("beta", n=30), "https://b.com/tos")
+    index.add_documents(_docs("gamma"), "https://a.com/tos")  # supersedes alpha
+    assert index.stale_fraction() > 0  # below the automatic compaction threshold
+
+    index.compact()
+
+    assert index.stale_fraction() == 0
+    assert index.store.index.ntotal == 40
+    for source, entry in index.manifest.items():
+        start, end = entry["ids"]
+        assert end - start == entry["chunks"]
+        for position in range(start, end):
+            doc = index.store.docstore.search(index.store.index_to_docstore_id[position])
+            assert doc.metadata["source"] == source
+            assert doc.metadata["content_hash"] == entry["content_hash"]
+
+    groups = index.search("beta clause", k=3, sources=["https://b.com/tos"])
+    assert [g["source"] for g in groups] == ["https://b.com/tos"]
+
+
+def test_domain_and_since_filters(embeddings, tmp_path):
+    index = _index(embeddings, tmp_path)
+    index.add_documents(_docs("alpha"), "https://a.com/tos")
+    index.add_documents(_docs("beta"), "https://b.com/tos")
+
+    groups = index.search("clause refunds", k=5, domains=["b.com"])
+    assert {g["source"] for g in groups} == {"https://b.com/tos"}
+
+    assert index.search("clause refunds", k=5, since=date.today() + timedelta(days=1)) == []
+    assert len(index.search("clause refunds", k=5, since=date.today())) == 2
+
+
+def test_results_grouped_per_document(embeddings, tmp_path):
+    index = _index(embeddings, tmp_path)
+    for name in ("alpha", "beta", "gamma"):
+        index.add_documents(_docs(name), f"https://{name}.com/tos")
+
+    groups = index.search("clause refunds termination", k=10, per_document=2)
+
+    assert len(groups) == 3
+    assert len({g["source"] for g in groups}) == 3
+    assert all(len(g["clauses"]) <= 2 for g in groups)
+    assert [g["best_score"] for g in groups] == sorted(g["best_score"] for g in groups)
+    for g in groups:
+        assert all(c["metadata"]["source"] == g["source"] for c in g["clauses"])
@@ -0,0 +1,74 @@
+import random
+
+from langchain.schema import Document
+
+from loaders.file_loader import split_documents
+from modules.version_module import diff_versions
+from tests.conftest import StubEmbeddings
+from vectorstore.snapshots import list_snapshots, load_snapshot_chunks, save_snapshot, split_clauses
+
+
+def _paragraph(rng, words):
+    return " ".join("".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(words))
+
+
+def _paragraphs(seed=0):
+    rng = random.Random(seed)
+    # One paragraph longer than a chunk, so the splitter overlaps inside it
+    sizes = [40, 50, 400, 45, 60, 35]
+    return [_paragraph(rng, n) for n in sizes]
+
+
+def test_identical_versions_are_unchanged_without_embedding(embeddings):
+    clauses = _paragraphs()
+    changes = diff_versions(embeddings, clauses, list(clauses))
+
+    assert changes == {"added": [], "removed": [], "modified": [], "unchanged": len(clauses)}
+    assert embeddings.calls == 0
+
+
+def test_added_removed_and_modified_clauses():
+    embeddings = StubEmbeddings(dimension=1024)
+    kept = "Either party may terminate this agreement with thirty days written notice to the other party."
+    refunds = "Refunds are available within fourteen days of purchase for unused subscriptions only."
+    dropped = "We may share anonymised usage statistics with selected advertising partners worldwide."
+    arbitration = "Disputes shall be resolved by binding arbitration seated in Delaware under AAA rules."
+
+    old = [kept, refunds, dropped]
+    new = [kept, refunds.replace("fourteen", "seven"), arbitration]
+    changes = diff_versions(embeddings, old, new)
+
+    assert changes["unchanged"] == 1
+    assert [m["new"] for m in changes["modified"]] == [new[1]]
+    assert "[-fourteen-]" in changes["modified"][0]["diff"]
+    assert "{+seven+}" in changes["modified"][0]["diff"]
+    assert changes["removed"] == [dropped]
+    assert changes["added"] == [arbitration]
+
+
+def test_split_clauses_round_trips_overlapping_chunks():
+    paragraphs = _paragraphs()
+    chunks = split_documents([Document(page_content="\n\n".join(paragraphs))])
+    assert any(
+        a.metadata["start_index"] + len(a.page_content) > b.metadata["start_index"]
+        for a, b in zip(chunks, chunks[1:])
+    ), "fixture should produce overlapping chunks"
+
+    assert split_clauses(chunks) == paragraphs
+
+
+def test_snapshot_only_saved_when_content_changes(tmp_path):
+    base = str(tmp_path)
+    paragraphs = _paragraphs()
+    docs = split_documents([Document(page_content="\n\n".join(paragraphs))])
+
+    first = save_snapshot(docs, "https://a.com/tos", base_path=base)
+    assert first is not None
+    assert save_snapshot(docs, "https://a.com/tos", base_path=base) is None
+
+    changed = split_documents([Document(page_content="\n\n".join(paragraphs[:-1]))])
+    second = save_snapshot(changed, "https://a.com/tos", base_path=base)
+
+    assert [s["id"] for s in list_snapshots("https://a.com/tos", base_path=base)] == [first["id"], second["id"]]
+    assert load_snapshot_chunks("https://a.com/tos", first["id"], base_path=base) == paragraphs
+    assert load_snapshot_chunks("https://a.com/tos", second["id"], base_path=base) == paragraphs[:-1]
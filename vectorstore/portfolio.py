@@ -0,0 +1,350 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import date
+from urllib.parse import urlparse
+
+import faiss
+import numpy as np
+import streamlit as st
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+PORTFOLIO_DIR = "portfolio_index"
+MANIFEST_FILE = "manifest.json"
+BACKFILL_MARKER = "backfilled"
+LEGACY_INDEX_DIR = "faiss_indexes"
+
+# Rebuild the index once this share of its vectors belongs to superseded versions.
+COMPACT_STALE_FRACTION = 0.3
+
+# HNSW graph parameters: M = neighbours per node, efSearch = candidate list size at query time.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 128
+# Bounds on the fetch_k doubling in search(), so a query never degrades into a full scan
+MAX_FETCH_K = 2048
+MAX_SEARCH_ROUNDS = 5
+
+
+def _content_hash(texts) -> str:
+    """Hash the chunk texts of a document so re-ingesting unchanged content is a no-op."""
+    digest = hashlib.md5()
+    for t in texts:
+        digest.update(t.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _domain_of(source: str) -> str:
+    return urlparse(source).netloc.lower() or source
+
+
+def _store_contents(store, start=0, count=None):
+    """Return (texts, metadatas, vectors) of a LangChain FAISS store, in FAISS id order."""
+    if count is None:
+        count = store.index.ntotal - start
+    docs = [store.docstore.search(store.index_to_docstore_id[i]) for i in range(start, start + count)]
+    vectors = store.index.reconstruct_n(start, count)
+    return [d.page_content for d in docs], [d.metadata for d in docs], vectors
+
+
+class PortfolioIndex:
+    """
+    A single FAISS (HNSW) index spanning every ingested T&C document.
+    Each chunk carries source/domain/ingested_at metadata so portfolio-wide
+    queries can be filtered and grouped per document. New documents are added
+    incrementally; when a source's content changes, its new chunks are added and
+    the old ones are excluded at query time (HNSW does not support removals)
+    until the index is compacted.
+
+    One instance is shared by all Streamlit sessions, so every read and write of
+    the index and manifest goes through a lock.
+    """
+
+    def __init__(self, embeddings, base_path=PORTFOLIO_DIR):
+        self.embeddings = embeddings
+        self.base_path = base_path
+        self.manifest_path = os.path.join(base_path, MANIFEST_FILE)
+        self.manifest = {}
+        self.store = None
+        self._lock = threading.Lock()
+        self._load()
+
+    # --------------------------
+    # Persistence
+    # --------------------------
+    def _load(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        if os.path.exists(os.path.join(self.base_path, "index.faiss")):
+            try:
+                self.store = FAISS.load_local(
+                    self.base_path, self.embeddings, allow_dangerous_deserialization=True
+                )
+                self.store.index.hnsw.efSearch = HNSW_EF_SEARCH
+            except Exception as e:
+                print(f"⚠️ Failed to load portfolio index, starting fresh: {e}")
+                self.store, self.manifest = None, {}
+
+    def _save(self):
+        if self.store is None:
+            return
+        os.makedirs(self.base_path, exist_ok=True)
+        self.store.save_local(self.base_path)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def _new_store(self, dimension: int):
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+        )
+
+    # --------------------------
+    # Ingestion
+    # --------------------------
+    def _append(self, texts, metadatas, vectors):
+        """Add pre-computed vectors to the index; returns their FAISS id range [start, end)."""
+        if self.store is None:
+            self.store = self._new_store(len(vectors[0]))
+        start = self.store.index.ntotal
+        self.store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+        return [start, start + len(texts)]
+
+    def _ingest(self, source, texts, metadatas, vectors, ingested_at):
+        content_hash = _content_hash(texts)
+        domain = _domain_of(source)
+        metadatas = [
+            {
+                **m,
+                "source": source,
+                "domain": domain,
+                "ingested_at": ingested_at,
+                "content_hash": content_hash,
+            }
+            for m in metadatas
+        ]
+        self.manifest[source] = {
+            "content_hash": content_hash,
+            "domain": domain,
+            "ingested_at": ingested_at,
+            "chunks": len(texts),
+            # FAISS ids of the current version's chunks: [start, end)
+            "ids": self._append(texts, metadatas, vectors),
+        }
+        return len(texts)
+
+    def add_documents(self, docs, source: str, vector_store=None) -> int:
+        """
+        Add a document's chunks to the portfolio index.
+        If `vector_store` is the per-URL store built from the same chunks, its vectors
+        are reused instead of calling the embedding model again.
+        Returns the number of chunks added (0 if this exact content is already indexed).
+        """
+        docs = [d for d in docs if d.page_content.strip()]
+        if not docs:
+            return 0
+
+        texts = [d.page_content for d in docs]
+        with self._lock:
+            entry = self.manifest.get(source)
+            if entry and entry["content_hash"] == _content_hash(texts):
+                return 0
+
+            vectors = None
+            if vector_store is not None and vector_store.index.ntotal == len(texts):
+                stored_texts, _, stored_vectors = _store_contents(vector_store)
+                if stored_texts == texts:
+                    vectors = stored_vectors
+            if vectors is None:
+                vectors = self.embeddings.embed_documents(texts)
+
+            added = self._ingest(source, texts, [d.metadata for d in docs], vectors,
+                                 date.today().isoformat())
+            if self.stale_fraction() > COMPACT_STALE_FRACTION:
+                self._compact()
+            self._save()
+            return added
+
+    def backfill(self, legacy_path=LEGACY_INDEX_DIR) -> int:
+        """
+        One-time import of the existing per-URL stores (faiss_<hash>) into the portfolio.
+        Their vectors and source metadata are read from disk, so nothing is re-embedded.
+        Returns the number of chunks added.
+        """
+        marker = os.path.join(self.base_path, BACKFILL_MARKER)
+        with self._lock:
+            if os.path.exists(marker) or not os.path.isdir(legacy_path):
+                return 0
+
+            added = 0
+            for name in sorted(os.listdir(legacy_path)):
+                path = os.path.join(legacy_path, name)
+                if not name.startswith("faiss_") or not os.path.isdir(path):
+                    continue
+                try:
+                    store = FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
+                except Exception as e:
+                    print(f"⚠️ Skipping {path} during portfolio backfill: {e}")
+                    continue
+                texts, metadatas, vectors = _store_contents(store)
+                source = next((m["source"] for m in metadatas if m.get("source")), None)
+                if not texts or not source or source in self.manifest:
+                    continue
+                ingested_at = date.fromtimestamp(os.path.getmtime(path)).isoformat()
+                added += self._ingest(source, texts, metadatas, vectors, ingested_at)
+
+            self._save()
+            os.makedirs(self.base_path, exist_ok=True)
+            with open(marker, "w", encoding="utf-8") as f:
+                f.write(date.today().isoformat())
+            print(f"✅ Backfilled {added} chunks into the portfolio index")
+            return added
+
+    # --------------------------
+    # Compaction
+    # --------------------------
+    def stale_fraction(self) -> float:
+        """Share of indexed vectors that belong to superseded document versions."""
+        if self.store is None or not self.store.index.ntotal:
+            return 0.0
+        live = sum(entry["chunks"] for entry in self.manifest.values())
+        return 1 - live / self.store.index.ntotal
+
+    def compact(self):
+        """Rebuild the index from the current chunks only, dropping superseded versions."""
+        with self._lock:
+            self._compact()
+            self._save()
+
+    def _compact(self):
+        old_store, self.store = self.store, None
+        if old_store is None:
+            return
+        for entry in self.manifest.values():
+            texts, metadatas, vectors = _store_contents(old_store, entry["ids"][0], entry["chunks"])
+            entry["ids"] = self._append(texts, metadatas, vectors)
+        print(f"✅ Compacted portfolio index: {old_store.index.ntotal} → {self.store.index.ntotal} vectors")
+
+    def sources(self):
+        """Return the manifest entries of all indexed documents."""
+        with self._lock:
+            return [{"source": s, **entry} for s, entry in sorted(self.manifest.items())]
+
+    # --------------------------
+    # Querying
+    # --------------------------
+    def _selected_ids(self, sources=None, domains=None, since=None, until=None):
+        """
+        FAISS ids of the current chunks of every document matching the filters,
+        and the number of matching documents.
+        """
+        ranges = []
+        for source, entry in self.manifest.items():
+            if sources and source not in sources:
+                continue
+            if domains and entry["domain"] not in domains:
+                continue
+            if since and entry["ingested_at"] < str(since):
+                continue
+            if until and entry["ingested_at"] > str(until):
+                continue
+            ranges.append(np.arange(*entry["ids"], dtype="int64"))
+        if not ranges:
+            return np.empty(0, dtype="int64"), 0
+        return np.concatenate(ranges), len(ranges)
+
+    def search(self, query: str, k=10, per_document=3, sources=None, domains=None,
+               since=None, until=None, fetch_k=None):
+        """
+        Find the top clauses across the whole portfolio.
+
+        Filters are resolved against the manifest into a set of FAISS ids and applied
+        inside the HNSW search (IDSelector), so superseded chunks and filtered-out
+        documents never take up candidate slots. If the per-document cap leaves fewer
+        than k clauses, the candidate count is doubled (at most MAX_SEARCH_ROUNDS times,
+        up to MAX_FETCH_K) until as many clauses as the matching documents can supply
+        (min(k, per_document * documents)) are found.
+
+        Args:
+            query: Natural-language question or clause description
+            k: Maximum number of clauses to return overall
+            per_document: Maximum clauses kept per source document
+            sources / domains: Optional lists restricting which documents are searched
+            since / until: Optional ISO dates (or date objects) bounding ingested_at
+            fetch_k: Initial number of candidates pulled from the index (defaults to 2 * k)
+        Returns:
+            List of groups ordered by best match:
+            [{"source", "domain", "ingested_at", "best_score", "clauses": [{"text", "score", "metadata"}]}]
+            Scores are L2 distances (lower is closer).
+        """
+        query_vector = np.array([self.embeddings.embed_query(query)], dtype="float32")
+
+        with self._lock:
+            if self.store is None:
+                return []
+            ids, n_documents = self._selected_ids(sources, domains, since, until)
+            if not len(ids):
+                return []
+            target = min(k, per_document * n_documents, len(ids))
+            return self._search_selected(query_vector, ids, k, per_document, target, fetch_k)
+
+    def _search_selected(self, query_vector, ids, k, per_document, target, fetch_k):
+        selector = faiss.IDSelectorBatch(ids)
+        limit = min(len(ids), MAX_FETCH_K)
+        fetch_k = min(fetch_k or 2 * k, limit)
+
+        for _ in range(MAX_SEARCH_ROUNDS):
+            ef_search = min(max(HNSW_EF_SEARCH, fetch_k), MAX_FETCH_K)
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+            distances, positions = self.store.index.search(query_vector, fetch_k, params=params)
+            groups = self._group_results(distances[0], positions[0], k, per_document)
+            taken = sum(len(g["clauses"]) for g in groups)
+            if taken >= target or fetch_k >= limit:
+                break
+            fetch_k = min(2 * fetch_k, limit)
+        return groups
+
+    def _group_results(self, distances, positions, k, per_document):
+        groups = {}
+        taken = 0
+        for score, position in zip(distances, positions):
+            if taken >= k:
+                break
+            if position < 0:
+                continue
+            doc = self.store.docstore.search(self.store.index_to_docstore_id[int(position)])
+            source = doc.metadata["source"]
+            entry = self.manifest[source]
+            group = groups.setdefault(source, {
+                "source": source,
+                "domain": entry["domain"],
+                "ingested_at": entry["ingested_at"],
+                "best_score": float(score),
+                "clauses": [],
+            })
+            if len(group["clauses"]) >= per_document:
+                continue
+            group["clauses"].append({
+                "text": doc.page_content,
+                "score": float(score),
+                "metadata": doc.metadata,
+            })
+            taken += 1
+
+        return sorted(groups.values(), key=lambda g: g["best_score"])
+
+
+@st.cache_resource(show_spinner="📚 Loading portfolio index...")
+def get_portfolio_index(_embeddings, base_path=PORTFOLIO_DIR):
+    """Load (or lazily create) the shared cross-document index, backfilling existing per-URL stores once."""
+    portfolio = PortfolioIndex(_embeddings, base_path=base_path)
+    portfolio.backfill()
+    return portfolio
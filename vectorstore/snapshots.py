@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+from loaders.file_loader import join_chunks
+from .store import _hash_source
+
+SNAPSHOT_DIR = "snapshots"
+# Paragraphs shorter than this (headings, list labels) are merged into the next clause.
+MIN_CLAUSE_CHARS = 120
+
+
+def chunk_hash(text: str) -> str:
+    """Content address of a single chunk."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def split_clauses(docs):
+    """
+    Turn retrieval chunks into overlap-free clause units.
+    The splitter's chunk overlap is stitched back into continuous text, which is then
+    split on blank lines, so clause boundaries do not depend on where chunks started.
+    """
+    text = join_chunks([d.page_content.strip() for d in docs if d.page_content.strip()])
+    clauses, pending = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        pending = f"{pending}\n{paragraph}" if pending else paragraph
+        if len(pending) >= MIN_CLAUSE_CHARS:
+            clauses.append(pending)
+            pending = ""
+    if pending:
+        clauses.append(pending)
+    return clauses
+
+
+def _source_dir(source: str, base_path: str) -> str:
+    return os.path.join(base_path, f"source_{_hash_source(source)}")
+
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def list_snapshots(source: str, base_path=SNAPSHOT_DIR):
+    """Return snapshot manifests for a source, oldest first."""
+    return _read_json(os.path.join(_source_dir(source, base_path), "versions.json"), [])
+
+
+def save_snapshot(docs, source: str, base_path=SNAPSHOT_DIR):
+    """
+    Store a versioned snapshot of a document as an ordered list of clause hashes.
+    Clauses (see split_clauses) live in a per-source content-addressed object store, so text shared
+    between versions is stored once. Returns the new snapshot manifest, or None if
+    the content is identical to the latest snapshot.
+    """
+    texts = split_clauses(docs)
+    if not texts:
+        return None
+
+    source_dir = _source_dir(source, base_path)
+    os.makedirs(source_dir, exist_ok=True)
+
+    hashes = [chunk_hash(t) for t in texts]
+    versions = list_snapshots(source, base_path)
+    if versions and versions[-1]["chunks"] == hashes:
+        return None
+
+    objects_path = os.path.join(source_dir, "objects.json")
+    objects = _read_json(objects_path, {})
+    for h, t in zip(hashes, texts):
+        objects.setdefault(h, t)
+    _write_json(objects_path, objects)
+
+    # Sequence number keeps ids unique; the content hash makes them self-describing
+    content_id = hashlib.sha1("".join(hashes).encode("utf-8")).hexdigest()[:8]
+    snapshot = {
+        "id": f"v{len(versions) + 1}-{content_id}",
+        "source": source,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "chunks": hashes,
+    }
+    versions.append(snapshot)
+    _write_json(os.path.join(source_dir, "versions.json"), versions)
+    return snapshot
+
+
+def load_snapshot_chunks(source: str, snapshot_id: str, base_path=SNAPSHOT_DIR):
+    """Return the ordered clause texts of a stored snapshot."""
+    source_dir = _source_dir(source, base_path)
+    objects = _read_json(os.path.join(source_dir, "objects.json"), {})
+    for snapshot in list_snapshots(source, base_path):
+        if snapshot["id"] == snapshot_id:
+            return [objects[h] for h in snapshot["chunks"] if h in objects]
+    return []
@@ -7,11 +7,20 @@ def _hash_source(source: str) -> str:
     """Create a short hash of the source URL or identifier for caching."""
     return hashlib.md5(source.encode("utf-8")).hexdigest()[:8]
 
+def stored_texts(vector_store):
+    """Return the chunk texts of a FAISS store in index order."""
+    return [
+        vector_store.docstore.search(vector_store.index_to_docstore_id[i]).page_content
+        for i in range(vector_store.index.ntotal)
+    ]
+
 @st.cache_resource(show_spinner="🔍 Building or loading vector store...")
 def get_vector_store(docs, embeddings, source: str, base_path="faiss_indexes"):
     """
     Build or load a FAISS vector store from documents and embeddings.
     Filters out empty documents to prevent FAISS errors.
+    A stored index is only reused if it holds exactly these chunks; if the document
+    has changed since it was indexed, the store is rebuilt.
     """
     os.makedirs(base_path, exist_ok=True)
     store_hash = _hash_source(source)
@@ -23,13 +32,15 @@ def get_vector_store(docs, embeddings, source: str, base_path="faiss_indexes"):
         st.error(f"No valid text found to create vector store for {source}.")
         return None
 
-    # Load existing FAISS index if available
+    # Load existing FAISS index if available and up to date
     if os.path.exists(store_path):
         try:
             vector_store = FAISS.load_local(
                 store_path, embeddings, allow_dangerous_deserialization=True
             )
-            return vector_store
+            if stored_texts(vector_store) == [d.page_content for d in docs]:
+                return vector_store
+            print(f"♻️ Content of {source} changed, rebuilding vector store")
         except Exception as e:
             st.warning(f"Failed to load existing vector store, rebuilding: {e}")
 